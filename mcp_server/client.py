@@ -2,28 +2,63 @@
 API client for Shopify.
 """
 
+import asyncio
 import json
 import logging
 import os
+import time
+from contextlib import asynccontextmanager
 
 import httpx
 from typing import Literal
 
+from mcp_server.deadline import ClientDisconnected, Deadline, DeadlineExceeded
+from mcp_server.recorder import get_recorder
+
 logger = logging.getLogger(__name__)
 
 
 class ShopifyClient:
     """Custom RapidAPI client using httpx."""
 
+    # Upstream calls currently in progress across all clients, used for readiness.
+    in_flight: int = 0
+    # Upstream connection slots shared by all clients, created on first use.
+    _slots: asyncio.Semaphore | None = None
+    # Connection pool shared by all clients; its size is the pool reported by /ready.
+    _session: httpx.AsyncClient | None = None
+
     def __init__(self, enable_retries: bool = False):
         """
         Initialize the client with API configuration from the environment file.
         """
         self.shopify_store = os.getenv("SHOPIFY_STORE")
-        self.shopify_store_url = f'https://{self.shopify_store}/api/mcp'
+        self.shopify_store_url = os.getenv("SHOPIFY_API_URL") or f'https://{self.shopify_store}/api/mcp'
         self.api_timeout = int(os.getenv("API_TIMEOUT_IN_SECONDS") or 10)
         self.enable_retries = enable_retries
-        self.session = httpx.AsyncClient()
+        self.max_connections = int(os.getenv("UPSTREAM_MAX_CONNECTIONS") or 100)
+        self.max_retries = int(os.getenv("UPSTREAM_MAX_RETRIES") or 2)
+        self.retry_backoff = float(os.getenv("UPSTREAM_RETRY_BACKOFF_IN_SECONDS") or 0.2)
+        self.queue_budget_fraction = float(os.getenv("UPSTREAM_QUEUE_BUDGET_FRACTION") or 0.25)
+        self.recorder = get_recorder()
+        self.session = ShopifyClient.shared_session()
+
+    @classmethod
+    def shared_session(cls) -> httpx.AsyncClient:
+        """Return the process-wide upstream connection pool, creating it on first use."""
+        if cls._session is None or cls._session.is_closed:
+            max_connections = int(os.getenv("UPSTREAM_MAX_CONNECTIONS") or 100)
+            cls._session = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+            )
+        return cls._session
+
+    @classmethod
+    async def close_session(cls) -> None:
+        """Close the shared connection pool. Called once at server shutdown."""
+        if cls._session is not None:
+            await cls._session.aclose()
+            cls._session = None
 
     async def __aenter__(self) -> ShopifyClient:
         return self
@@ -32,84 +67,203 @@ class ShopifyClient:
         await self.close()
 
     async def close(self):
-        if self.session:
-            await self.session.aclose()
+        """
+        Release this client. The shared connection pool stays open until close_session().
+        """
+        self.session = None
+
+    @asynccontextmanager
+    async def _upstream_slot(self, deadline: Deadline):
+        """
+        Wait for a shared upstream connection slot, spending at most the queueing share of the budget.
+        """
+        if ShopifyClient._slots is None:
+            ShopifyClient._slots = asyncio.Semaphore(self.max_connections)
+
+        queue_timeout = min(deadline.budget * self.queue_budget_fraction, deadline.remaining())
+        try:
+            async with asyncio.timeout(queue_timeout):
+                await ShopifyClient._slots.acquire()
+        except TimeoutError:
+            raise DeadlineExceeded(f"Timed out after {queue_timeout:.2f}s waiting for an upstream connection slot")
+        try:
+            yield
+        finally:
+            ShopifyClient._slots.release()
+
+    async def _until_disconnected(self, deadline: Deadline, coro):
+        """
+        Await coro, cancelling it if the HTTP client of the MCP request disconnects first.
+
+        The tool task itself is left alone; only the upstream work is cancelled, which
+        releases its connection slot and lets the tool return normally.
+        """
+        if deadline.request is None:
+            return await coro
+
+        async def wait_for_disconnect():
+            while (await deadline.request.receive())["type"] != "http.disconnect":
+                pass
+
+        work = asyncio.ensure_future(coro)
+        watcher = asyncio.ensure_future(wait_for_disconnect())
+        try:
+            await asyncio.wait({work, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            if not work.done() and watcher.exception() is not None:
+                # Disconnects cannot be observed on this server; just wait for the work.
+                logger.warning(f"Unable to watch for client disconnect: {watcher.exception()!r}")
+                await asyncio.wait({work})
+        except asyncio.CancelledError:
+            work.cancel()
+            await asyncio.gather(work, return_exceptions=True)
+            raise
+        finally:
+            watcher.cancel()
+
+        if not work.done():
+            work.cancel()
+            await asyncio.gather(work, return_exceptions=True)
+            raise ClientDisconnected("Client disconnected before the upstream call completed")
+        return work.result()
+
+    async def _post_with_retries(self, params: dict | None, deadline: Deadline) -> httpx.Response:
+        """
+        POST to the Shopify API, retrying transport errors and 5xx responses within the deadline.
+
+        Each attempt gets an equal share of the remaining budget.
+        """
+        headers = {
+            "Content-Type": "application/json"
+        }
+        attempts = self.max_retries + 1 if self.enable_retries else 1
+
+        for attempt in range(attempts):
+            timeout = deadline.remaining() / (attempts - attempt)
+            if timeout <= 0:
+                raise DeadlineExceeded(f"Deadline of {deadline.budget:.2f}s exceeded before attempt {attempt + 1}")
+
+            is_last_attempt = attempt == attempts - 1
+            ShopifyClient.in_flight += 1
+            try:
+                async with asyncio.timeout(timeout):
+                    response = await self.session.post(
+                        self.shopify_store_url,
+                        headers=headers,
+                        json=params,
+                        timeout=timeout,
+                    )
+            except (httpx.TransportError, TimeoutError) as e:
+                if is_last_attempt:
+                    if isinstance(e, (httpx.TimeoutException, TimeoutError)):
+                        raise DeadlineExceeded(f"Upstream call timed out after {timeout:.2f}s") from e
+                    raise
+                logger.warning(f"Upstream attempt {attempt + 1}/{attempts} failed: {e!r}. Retrying.")
+            else:
+                if response.status_code < 500 or is_last_attempt:
+                    return response
+                logger.warning(f"Upstream attempt {attempt + 1}/{attempts} returned {response.status_code}. Retrying.")
+            finally:
+                ShopifyClient.in_flight -= 1
+
+            await asyncio.sleep(min(self.retry_backoff * 2 ** attempt, deadline.remaining()))
 
     async def _make_request(
         self,
         method: Literal["GET", "POST"],
         params: dict | None = None,
+        deadline: Deadline | None = None,
     ) -> dict:
         """
         Make an HTTP request to the Shopify API
 
+        The request is cancelled, and its connection slot released, as soon as the
+        calling MCP request is cancelled or the deadline runs out.
+
         Args:
             method (str): HTTP method (e.g., "GET", "POST").
             params (dict | None): Query parameters.
+            deadline (Deadline | None): Time budget for queueing, retries and the call.
         Returns:
             dict: JSON response from the API
         """
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        logger.info(f"Making API request with params: {params}")
-        async with self.session as client:
+        deadline = deadline or Deadline(self.api_timeout)
+
+        logger.info(f"Making API request with params: {params} (budget {deadline.budget:.2f}s)")
+        started = started_at = None
+        response_data = upstream_status = None
+
+        async def send() -> httpx.Response:
+            nonlocal started, started_at
+            async with self._upstream_slot(deadline):
+                started, started_at = time.perf_counter(), time.time()
+                return await self._post_with_retries(params, deadline)
+
+        try:
+            response = await self._until_disconnected(deadline, send())
+
+            # Read response body before raising for status
             try:
-                response = await client.post(
-                    self.shopify_store_url,
-                    headers=headers,
-                    json=params,
-                    timeout=self.api_timeout,
-                )
-
-                # Read response body before raising for status
-                try:
-                    response_data = response.json()
-                except (ValueError, AttributeError):
-                    response_data = response.text
-
-                response.raise_for_status()
-                return response_data, response.status_code
-            except httpx.HTTPStatusError as e:
-                status_code = 500
-                message = str(e)
-                
-                # Try to get error details from response body
-                try:
-                    error_data = e.response.json()
-                    api_message = error_data.get("message", error_data.get("error", error_data.get("detail", str(e))))
-                    message = f"{message} | API Error: {api_message}"
-                    error_result = {
-                        "error": True,
-                        "error_message": message,
-                        "status_code": status_code,
-                        "error_data": error_data
-                    }
-                except (ValueError, AttributeError):
-                    response_text = e.response.text[:500] if hasattr(e.response, 'text') else None
-                    message = f"{message} | Response: {response_text}"
-                    error_result = {
-                        "error": True,
-                        "error_message": message,
-                        "status_code": status_code,
-                    }
-                
-                logger.error(f"API request failed with status {status_code}: {error_result}")
-                return error_result, status_code
-            except Exception as e:
-                status_code = 500
-                message = str(e)
-                error_result = {"error": True, "error_message": message}
-                logger.error(f"Exception raised from the API with params: {params}. Error: {error_result}")
-                return error_result, status_code
-            finally:
-                await self.close()
+                response_data = response.json()
+            except (ValueError, AttributeError):
+                response_data = response.text
+
+            upstream_status = response.status_code
+            response.raise_for_status()
+            return response_data, response.status_code
+        except asyncio.CancelledError:
+            logger.info(f"API request cancelled by the caller with params: {params}")
+            raise
+        except ClientDisconnected as e:
+            status_code = 499
+            error_result = {"error": True, "error_message": str(e), "status_code": status_code}
+            logger.info(f"API request abandoned with params: {params}. Error: {error_result}")
+            return error_result, status_code
+        except DeadlineExceeded as e:
+            status_code = 504
+            error_result = {"error": True, "error_message": str(e), "status_code": status_code}
+            logger.error(f"API request exceeded its deadline with params: {params}. Error: {error_result}")
+            return error_result, status_code
+        except httpx.HTTPStatusError as e:
+            status_code = 500
+            message = str(e)
+
+            # Try to get error details from response body
+            try:
+                error_data = e.response.json()
+                api_message = error_data.get("message", error_data.get("error", error_data.get("detail", str(e))))
+                message = f"{message} | API Error: {api_message}"
+                error_result = {
+                    "error": True,
+                    "error_message": message,
+                    "status_code": status_code,
+                    "error_data": error_data
+                }
+            except (ValueError, AttributeError):
+                response_text = e.response.text[:500] if hasattr(e.response, 'text') else None
+                message = f"{message} | Response: {response_text}"
+                error_result = {
+                    "error": True,
+                    "error_message": message,
+                    "status_code": status_code,
+                }
+
+            logger.error(f"API request failed with status {status_code}: {error_result}")
+            return error_result, status_code
+        except Exception as e:
+            status_code = 500
+            message = str(e)
+            error_result = {"error": True, "error_message": message}
+            logger.error(f"Exception raised from the API with params: {params}. Error: {error_result}")
+            return error_result, status_code
+        finally:
+            if self.recorder and started is not None:
+                self.recorder.record(params, response_data, upstream_status, started_at, time.perf_counter() - started)
 
     async def make_request(
         self,
         tool_name: str,
-        arguments: dict
+        arguments: dict,
+        deadline: Deadline | None = None,
     ) -> dict:
         """Request to the Shopify MCP server."""
         logger.info(f"Calling the Shopify MCP server tool: {tool_name} with args: {arguments}")
@@ -123,4 +277,4 @@ class ShopifyClient:
                 "arguments": arguments
             }
         }
-        return await self._make_request("POST", params=params)
+        return await self._make_request("POST", params=params, deadline=deadline)
@@ -0,0 +1,210 @@
+"""
+Negotiated response compression for the Shopify MCP server.
+
+Supports zstd (Python 3.14 `compression.zstd`), brotli (optional `brotli`
+package) and gzip. Encodings whose codec is not importable are skipped.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    """
+    Compress data with the given content encoding.
+
+    Args:
+        data (bytes): Payload to compress.
+        encoding (str): One of "zstd", "br" or "gzip".
+        level (int): Codec-specific compression level (brotli quality).
+    Returns:
+        bytes: The compressed payload.
+    """
+    if encoding == "zstd":
+        return zstd.compress(data, level=level)
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def available_encodings() -> list[str]:
+    """Encodings this process can produce, in server preference order."""
+    codecs = {"zstd": zstd, "br": brotli, "gzip": gzip}
+    return [encoding for encoding, codec in codecs.items() if codec is not None]
+
+
+def enabled_encodings() -> list[str]:
+    """Available encodings allowed by `COMPRESSION_ENCODINGS`, in its order."""
+    enabled = os.getenv("COMPRESSION_ENCODINGS") or "zstd,br,gzip"
+    return [
+        encoding for encoding in (e.strip() for e in enabled.split(","))
+        if encoding in available_encodings()
+    ]
+
+
+def negotiate_encoding(accept_encoding: str, supported: list[str]) -> str | None:
+    """
+    Pick the best supported encoding for an Accept-Encoding header.
+
+    The client's q-values decide first; ties go to the server preference order
+    of `supported`. Returns None when the response should not be compressed.
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, *params = part.split(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing buffered responses above a size threshold."""
+
+    def __init__(self, app):
+        self.app = app
+        self.min_size = int(os.getenv("COMPRESSION_MIN_SIZE_IN_BYTES") or 1024)
+        self.levels = {
+            "zstd": int(os.getenv("COMPRESSION_ZSTD_LEVEL") or 3),
+            "br": int(os.getenv("COMPRESSION_BROTLI_QUALITY") or 4),
+            "gzip": int(os.getenv("COMPRESSION_GZIP_LEVEL") or 6),
+        }
+        self.encodings = enabled_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        encoding = negotiate_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"), self.encodings)
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        body = []
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                return await send(message)
+
+            if message["type"] == "http.response.start":
+                response_headers = dict(message.get("headers", []))
+                content_type = response_headers.get(b"content-type", b"")
+                status = message["status"]
+                if (
+                    status < 200
+                    or status in (204, 304)
+                    or b"content-encoding" in response_headers
+                    or content_type.startswith(b"text/event-stream")
+                ):
+                    passthrough = True
+                    return await send(message)
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            payload = b"".join(body)
+            if len(payload) < self.min_size:
+                await send(start_message)
+                await send({"type": "http.response.body", "body": payload})
+                return
+
+            payload = compress(payload, encoding, self.levels[encoding])
+            response_headers = [
+                (name, value) for name, value in start_message.get("headers", [])
+                if name not in (b"content-length", b"vary")
+            ]
+            # Keep any Vary the app set, in one header, adding Accept-Encoding only if missing.
+            vary = b", ".join(value for name, value in start_message.get("headers", []) if name == b"vary")
+            if not vary:
+                vary = b"Accept-Encoding"
+            elif b"accept-encoding" not in vary.lower() and vary.strip() != b"*":
+                vary += b", Accept-Encoding"
+            response_headers.append((b"vary", vary))
+            response_headers.append((b"content-encoding", encoding.encode()))
+            response_headers.append((b"content-length", str(len(payload)).encode()))
+
+            await send({**start_message, "headers": response_headers})
+            await send({"type": "http.response.body", "body": payload})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class PrecompressedAsset:
+    """A static asset compressed once, at the highest level, for every enabled encoding."""
+
+    max_levels = {"zstd": 19, "br": 11, "gzip": 9}
+
+    def __init__(self, content: str, media_type: str, encodings: list[str]):
+        self.media_type = media_type
+        self.identity = content.encode("utf-8")
+        self.digest = hashlib.sha256(self.identity).hexdigest()[:16]
+        self.variants = {
+            encoding: compress(self.identity, encoding, self.max_levels[encoding])
+            for encoding in encodings
+        }
+
+    def etag(self, encoding: str | None) -> str:
+        """Strong ETag of one representation; each encoding has its own bytes, so its own tag."""
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    def select(self, accept_encoding: str) -> tuple[bytes, str | None]:
+        encoding = negotiate_encoding(accept_encoding, list(self.variants))
+        if encoding is None:
+            return self.identity, None
+        return self.variants[encoding], encoding
+
+
+def precompress_assets(assets: dict[str, str]) -> dict[str, PrecompressedAsset]:
+    """Pre-compress the static UI assets once at startup, for the encodings the server may use."""
+    encodings = enabled_encodings()
+    media_types = {".css": "text/css; charset=utf-8", ".js": "text/javascript; charset=utf-8"}
+    precompressed = {
+        name: PrecompressedAsset(
+            content, media_types.get(os.path.splitext(name)[1], "text/plain; charset=utf-8"), encodings
+        )
+        for name, content in assets.items()
+    }
+    for name, asset in precompressed.items():
+        sizes = ", ".join(f"{encoding}={len(data)}" for encoding, data in asset.variants.items())
+        logger.info(f"Pre-compressed UI asset {name}: identity={len(asset.identity)}, {sizes}")
+    return precompressed
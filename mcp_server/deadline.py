@@ -0,0 +1,69 @@
+"""
+Per-request time budgets for the Shopify MCP tools.
+
+A deadline is created when a tool starts and is threaded down to the
+upstream call, so queueing, retries and the HTTP request all draw from the
+same budget instead of each getting a fresh global timeout. It also carries
+the HTTP request of the MCP call, so the upstream call can be cancelled when
+the client disconnects.
+"""
+
+import os
+import time
+
+from fastmcp import Context
+from starlette.requests import Request
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a tool's time budget runs out before the upstream call completes."""
+
+
+class ClientDisconnected(Exception):
+    """Raised when the MCP client disconnects before the upstream call completes."""
+
+
+class Deadline:
+    """A monotonic time budget shared by every stage of a tool call."""
+
+    def __init__(self, budget: float, request: Request | None = None):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        self.request = request
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    @classmethod
+    def for_tool(cls, ctx: Context, tool_name: str) -> Deadline:
+        """
+        Build the deadline for a tool call.
+
+        The budget comes from `<TOOL_NAME>_TIMEOUT_IN_SECONDS`, falling back to
+        `API_TIMEOUT_IN_SECONDS`. A client may ask for a shorter budget by
+        sending `timeoutMs` in the request `_meta`; it can never extend it.
+
+        Args:
+            ctx (Context): The FastMCP context of the current request.
+            tool_name (str): Name of the MCP tool being called.
+        Returns:
+            Deadline: The deadline for this call.
+        """
+        budget = float(
+            os.getenv(f"{tool_name.upper()}_TIMEOUT_IN_SECONDS")
+            or os.getenv("API_TIMEOUT_IN_SECONDS")
+            or 10
+        )
+
+        request_context = ctx.request_context if ctx else None
+        meta = request_context.meta if request_context else None
+        timeout_ms = getattr(meta, "timeoutMs", None) if meta else None
+        if isinstance(timeout_ms, (int, float)) and timeout_ms > 0:
+            budget = min(budget, timeout_ms / 1000)
+
+        request = getattr(request_context, "request", None) if request_context else None
+        return cls(budget, request if isinstance(request, Request) else None)
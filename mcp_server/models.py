@@ -0,0 +1,197 @@
+"""
+Compact typed models for the Shopify product and cart payloads.
+
+The models are slotted dataclasses decoded straight from the upstream JSON.
+They keep only the fields the UI renderers use, for rendering and caching;
+tools still return the upstream JSON unchanged. Fields missing upstream stay
+None, and `to_dict` leaves them out of the nested upstream shape.
+"""
+
+import sys
+from dataclasses import dataclass
+
+
+def _str(value) -> str | None:
+    return None if value is None else str(value)
+
+
+def _int(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _bool(value) -> bool | None:
+    return None if value is None else bool(value)
+
+
+def _currency(value) -> str | None:
+    # Currency codes repeat on every price; interning keeps one copy per code.
+    return None if value is None else sys.intern(str(value))
+
+
+def _money(data: dict | None) -> tuple[str | None, str | None]:
+    data = data or {}
+    return _str(data.get("amount")), _currency(data.get("currency"))
+
+
+def _present(data: dict) -> dict:
+    """Drop the keys whose value was absent upstream."""
+    return {key: value for key, value in data.items() if value is not None}
+
+
+@dataclass(slots=True, frozen=True)
+class Variant:
+    variant_id: str | None
+    title: str | None
+    price: str | None
+    currency: str | None
+    available: bool | None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Variant:
+        return cls(
+            variant_id=_str(data.get("variant_id")),
+            title=_str(data.get("title")),
+            price=_str(data.get("price")),
+            currency=_currency(data.get("currency")),
+            available=_bool(data.get("available")),
+        )
+
+    def to_dict(self) -> dict:
+        return _present({
+            "variant_id": self.variant_id,
+            "title": self.title,
+            "price": self.price,
+            "currency": self.currency,
+            "available": self.available,
+        })
+
+
+@dataclass(slots=True, frozen=True)
+class Product:
+    product_id: str | None
+    title: str | None
+    description: str | None
+    url: str | None
+    image_url: str | None
+    price_min: str | None
+    price_max: str | None
+    currency: str | None
+    variants: tuple[Variant, ...]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Product:
+        price_range = data.get("price_range") or {}
+        return cls(
+            product_id=_str(data.get("product_id")),
+            title=_str(data.get("title")),
+            description=_str(data.get("description")),
+            url=_str(data.get("url")),
+            image_url=_str(data.get("image_url")),
+            price_min=_str(price_range.get("min")),
+            price_max=_str(price_range.get("max")),
+            currency=_currency(price_range.get("currency")),
+            variants=tuple(Variant.from_dict(v) for v in data.get("variants") or ()),
+        )
+
+    @property
+    def first_variant(self) -> Variant | None:
+        return self.variants[0] if self.variants else None
+
+    def to_dict(self) -> dict:
+        price_range = _present({"min": self.price_min, "max": self.price_max, "currency": self.currency})
+        return _present({
+            "product_id": self.product_id,
+            "title": self.title,
+            "description": self.description,
+            "url": self.url,
+            "image_url": self.image_url,
+            "price_range": price_range or None,
+            "variants": [v.to_dict() for v in self.variants],
+        })
+
+
+@dataclass(slots=True, frozen=True)
+class CartLine:
+    line_id: str | None
+    quantity: int | None
+    total_amount: str | None
+    currency: str | None
+    variant_id: str | None
+    variant_title: str | None
+    product_id: str | None
+    product_title: str | None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> CartLine:
+        merchandise = data.get("merchandise") or {}
+        product = merchandise.get("product") or {}
+        total_amount, currency = _money((data.get("cost") or {}).get("total_amount"))
+        return cls(
+            line_id=_str(data.get("id")),
+            quantity=_int(data.get("quantity")),
+            total_amount=total_amount,
+            currency=currency,
+            variant_id=_str(merchandise.get("id")),
+            variant_title=_str(merchandise.get("title")),
+            product_id=_str(product.get("id")),
+            product_title=_str(product.get("title")),
+        )
+
+    def to_dict(self) -> dict:
+        total_amount = _present({"amount": self.total_amount, "currency": self.currency})
+        product = _present({"id": self.product_id, "title": self.product_title})
+        return _present({
+            "id": self.line_id,
+            "quantity": self.quantity,
+            "cost": {"total_amount": total_amount} if total_amount else None,
+            "merchandise": _present({
+                "id": self.variant_id,
+                "title": self.variant_title,
+                "product": product or None,
+            }) or None,
+        })
+
+
+@dataclass(slots=True, frozen=True)
+class Cart:
+    cart_id: str | None
+    checkout_url: str | None
+    total_quantity: int | None
+    subtotal_amount: str | None
+    subtotal_currency: str | None
+    total_amount: str | None
+    currency: str | None
+    lines: tuple[CartLine, ...]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Cart:
+        cost = data.get("cost") or {}
+        subtotal_amount, subtotal_currency = _money(cost.get("subtotal_amount"))
+        total_amount, currency = _money(cost.get("total_amount"))
+        lines = tuple(CartLine.from_dict(line) for line in data.get("lines") or ())
+        return cls(
+            cart_id=_str(data.get("id")),
+            checkout_url=_str(data.get("checkout_url")),
+            total_quantity=_int(data.get("total_quantity")),
+            subtotal_amount=subtotal_amount,
+            subtotal_currency=subtotal_currency,
+            total_amount=total_amount,
+            currency=currency,
+            lines=lines,
+        )
+
+    def to_dict(self) -> dict:
+        cost = _present({
+            "subtotal_amount": _present({"amount": self.subtotal_amount, "currency": self.subtotal_currency}) or None,
+            "total_amount": _present({"amount": self.total_amount, "currency": self.currency}) or None,
+        })
+        return _present({
+            "id": self.cart_id,
+            "checkout_url": self.checkout_url,
+            "total_quantity": self.total_quantity,
+            "cost": cost or None,
+            "lines": [line.to_dict() for line in self.lines],
+        })
@@ -0,0 +1,203 @@
+"""
+Readiness monitoring and load shedding for the Shopify MCP server.
+
+The monitor keeps a cached, periodically refreshed picture of the signals
+that decide whether this pod should receive traffic: upstream store latency,
+event-loop lag, in-flight MCP requests and upstream pool saturation.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+
+import httpx
+
+from mcp_server.client import ShopifyClient
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessMonitor:
+    """Tracks readiness signals and decides when to shed load."""
+
+    def __init__(self):
+        """
+        Initialize the thresholds from the environment file.
+        """
+        shopify_store = os.getenv("SHOPIFY_STORE")
+        self.shopify_store_url = os.getenv("SHOPIFY_API_URL") or f'https://{shopify_store}/api/mcp'
+        self.probe_interval = float(os.getenv("READINESS_PROBE_INTERVAL_IN_SECONDS") or 15)
+        self.probe_timeout = float(os.getenv("READINESS_PROBE_TIMEOUT_IN_SECONDS") or 5)
+        self.max_probe_latency = float(os.getenv("READINESS_MAX_PROBE_LATENCY_IN_SECONDS") or 3)
+        self.probe_failure_threshold = int(os.getenv("READINESS_PROBE_FAILURE_THRESHOLD") or 3)
+        self.lag_interval = float(os.getenv("READINESS_LAG_INTERVAL_IN_SECONDS") or 0.5)
+        self.max_loop_lag_ms = float(os.getenv("SHED_MAX_EVENT_LOOP_LAG_IN_MS") or 250)
+        self.max_in_flight = int(os.getenv("SHED_MAX_IN_FLIGHT") or 90)
+        self.max_pool_saturation = float(os.getenv("SHED_MAX_POOL_SATURATION") or 0.95)
+        self.retry_after = int(os.getenv("SHED_RETRY_AFTER_IN_SECONDS") or 2)
+        self.pool_size = int(os.getenv("UPSTREAM_MAX_CONNECTIONS") or 100)
+
+        self.in_flight = 0
+        self.loop_lag_ms = 0.0
+        self.probe_ok: bool | None = None
+        self.probe_latency: float | None = None
+        self.probe_error: str | None = None
+        self.probe_checked_at: float | None = None
+        # Consecutive probes that failed or were slower than max_probe_latency.
+        self.probe_failures = 0
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def upstream_in_flight(self) -> int:
+        return ShopifyClient.in_flight
+
+    @property
+    def pool_saturation(self) -> float:
+        return self.upstream_in_flight / self.pool_size if self.pool_size else 0.0
+
+    def start(self) -> None:
+        """Start the background probe and lag tasks. Called from the app lifespan."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._probe_loop()),
+            asyncio.create_task(self._lag_loop()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _probe_loop(self) -> None:
+        params = {"jsonrpc": "2.0", "method": "tools/list", "id": 1}
+        async with httpx.AsyncClient() as client:
+            while True:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(
+                        self.shopify_store_url,
+                        headers={"Content-Type": "application/json"},
+                        json=params,
+                        timeout=self.probe_timeout,
+                    )
+                    response.raise_for_status()
+                    error = None
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                    logger.warning(f"Upstream readiness probe failed: {error}")
+                self.record_probe(time.perf_counter() - started, error)
+                await asyncio.sleep(self.probe_interval)
+
+    def record_probe(self, latency: float, error: str | None = None) -> None:
+        """
+        Store the result of one upstream probe.
+
+        Args:
+            latency (float): Seconds the probe took.
+            error (str | None): Why the probe failed, None if it succeeded.
+        """
+        self.probe_ok = error is None
+        self.probe_error = error
+        self.probe_latency = latency
+        self.probe_checked_at = time.time()
+        if error is not None or latency > self.max_probe_latency:
+            self.probe_failures += 1
+        else:
+            self.probe_failures = 0
+
+    async def _lag_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.loop_lag_ms = max(0.0, (loop.time() - expected) * 1000)
+
+    def shed_reason(self) -> str | None:
+        """Return why a new request should be shed, or None to admit it."""
+        if self.in_flight >= self.max_in_flight:
+            return "too many in-flight requests"
+        if self.loop_lag_ms > self.max_loop_lag_ms:
+            return "event loop lag above threshold"
+        if self.pool_saturation >= self.max_pool_saturation:
+            return "upstream pool saturated"
+        # Every pod probes the same store, so one transient failure must not shed the whole fleet.
+        if self.probe_failures >= self.probe_failure_threshold:
+            if self.probe_ok is False:
+                return "upstream store unreachable"
+            return "upstream store latency above threshold"
+        return None
+
+    def snapshot(self) -> dict:
+        reason = self.shed_reason()
+        if reason is None and self.probe_ok is None:
+            reason = "upstream probe pending"
+        return {
+            "status": "ready" if reason is None else "not_ready",
+            "reason": reason,
+            "upstream": {
+                "ok": self.probe_ok,
+                "latency_seconds": self.probe_latency,
+                "error": self.probe_error,
+                "checked_at": self.probe_checked_at,
+                "consecutive_failures": self.probe_failures,
+            },
+            "event_loop_lag_ms": round(self.loop_lag_ms, 2),
+            "in_flight": self.in_flight,
+            "pool_size": self.pool_size,
+            "upstream_in_flight": self.upstream_in_flight,
+            "pool_saturation": round(self.pool_saturation, 3),
+        }
+
+
+class LoadSheddingMiddleware:
+    """ASGI middleware returning fast 503s while the monitor reports overload."""
+
+    exempt_paths = ("/health", "/ready")
+    # Static UI assets are cheap, pre-compressed and never touch the upstream store.
+    exempt_prefixes = ("/ui/assets/",)
+
+    def __init__(self, app, monitor: ReadinessMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        if scope["path"] in self.exempt_paths or scope["path"].startswith(self.exempt_prefixes):
+            return await self.app(scope, receive, send)
+
+        reason = self.monitor.shed_reason()
+        if reason is not None:
+            logger.warning(f"Shedding request to {scope['path']}: {reason}")
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"retry-after", str(self.monitor.retry_after).encode()),
+                ],
+            })
+            await send({
+                "type": "http.response.body",
+                "body": json.dumps({
+                    "error": True,
+                    "error_message": f"Service overloaded: {reason}",
+                }).encode(),
+            })
+            return
+
+        # Only POSTs carry MCP requests; a GET /mcp is the session's long-lived SSE
+        # stream and would otherwise count as in flight for the whole session.
+        if scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+
+        self.monitor.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.in_flight -= 1
@@ -0,0 +1,245 @@
+"""
+Opt-in capture of the JSON-RPC traffic between the server and the Shopify store.
+
+When `TRAFFIC_RECORD_PATH` is set, every upstream call made by `ShopifyClient`
+is written as one JSON line (sanitized request, response, status and timing)
+to a size-rotated file. `scripts/replay_traffic.py` replays these files.
+
+Sanitizing, serializing and writing happen on a background thread; the event
+loop only enqueues the raw call and drops it if the queue is full.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+logger = logging.getLogger(__name__)
+
+# Keys whose whole value identifies a shopper or grants access to a cart. Address,
+# buyer, attribute and discount objects are redacted as a whole, which also covers
+# the names, companies and cities inside them without touching tool "name"s.
+SENSITIVE_KEYS = {
+    "cart_id",
+    "checkout_url",
+    "email",
+    "phone",
+    "customer_access_token",
+    "first_name",
+    "last_name",
+    "company",
+    "address1",
+    "address2",
+    "city",
+    "province",
+    "province_code",
+    "zip",
+    "country_code",
+    "note",
+    "buyer_identity",
+    "delivery",
+    "delivery_address",
+    "delivery_addresses",
+    "shipping_address",
+    "billing_address",
+    "address",
+    "addresses",
+    "attributes",
+    "discount_codes",
+    "gift_card_codes",
+}
+SENSITIVE_PREFIXES = ("gid://shopify/Cart/", "gid://shopify/CartLine/", "gid://shopify/Customer/")
+REDACTED_PREFIX = "redacted:"
+
+
+def redact(value, salt: str = "") -> str:
+    """Replace a value with a stable hash, so the same cart maps to the same token across records."""
+    if isinstance(value, str) and value.startswith(REDACTED_PREFIX):
+        return value
+    text = value if isinstance(value, str) else json.dumps(value, sort_keys=True)
+    digest = hashlib.sha256(f"{salt}{text}".encode()).hexdigest()[:16]
+    return f"{REDACTED_PREFIX}{digest}"
+
+
+def sanitize(data, salt: str = ""):
+    """
+    Recursively redact sensitive values, including inside JSON-encoded text fields.
+
+    Sanitizing is idempotent, so recorded arguments match again when replayed.
+    """
+    if isinstance(data, dict):
+        return {
+            key: redact(value, salt) if key in SENSITIVE_KEYS and value is not None else sanitize(value, salt)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [sanitize(item, salt) for item in data]
+    if isinstance(data, str):
+        if data.startswith(SENSITIVE_PREFIXES):
+            return redact(data, salt)
+        if data[:1] in ("{", "["):
+            try:
+                return json.dumps(sanitize(json.loads(data), salt))
+            except ValueError:
+                return data
+    return data
+
+
+def record_path(path: str) -> str:
+    """
+    Resolve the per-process recording path.
+
+    A `{pid}` placeholder is replaced by the process ID; without one, the PID is
+    added before the extension. Workers may be forked by uvicorn or gunicorn
+    without any setting this process can see, so every process always gets its
+    own file and never clobbers another worker's rotations.
+    """
+    if "{pid}" in path:
+        return path.replace("{pid}", str(os.getpid()))
+    root, ext = os.path.splitext(path)
+    return f"{root}.{os.getpid()}{ext}"
+
+
+class _TrafficFormatter(logging.Formatter):
+    """Sanitizes and serializes a recorded call; runs on the listener thread."""
+
+    def __init__(self, salt: str):
+        super().__init__()
+        self.salt = salt
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = record.msg
+        return json.dumps({
+            **entry,
+            "request": sanitize(entry["request"], self.salt),
+            "response": sanitize(entry["response"], self.salt),
+        })
+
+
+class _TrafficQueueHandler(QueueHandler):
+    """Enqueues the raw record without formatting it, dropping it when the queue is full."""
+
+    def __init__(self, queue_: queue.Queue):
+        super().__init__(queue_)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1:
+                logger.warning("Traffic recording queue is full; dropping records.")
+
+
+class _TrafficQueueListener(QueueListener):
+    """Waits for room for the stop sentinel instead of failing on a full queue."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+class TrafficRecorder:
+    """Writes sanitized upstream request/response pairs to a rotating JSON-lines file."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int,
+        backup_count: int,
+        sample_rate: float,
+        salt: str,
+        queue_size: int = 10000,
+    ):
+        self.path = path
+        self.sample_rate = sample_rate
+        file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        file_handler.setFormatter(_TrafficFormatter(salt))
+        self.queue_handler = _TrafficQueueHandler(queue.Queue(maxsize=queue_size))
+        self.listener = _TrafficQueueListener(self.queue_handler.queue, file_handler)
+        self.listener.start()
+
+        self.writer = logging.getLogger("mcp_server.traffic")
+        self.writer.setLevel(logging.INFO)
+        self.writer.propagate = False
+        self.writer.handlers = [self.queue_handler]
+
+    @classmethod
+    def from_env(cls) -> TrafficRecorder | None:
+        path = os.getenv("TRAFFIC_RECORD_PATH")
+        if not path:
+            return None
+        path = record_path(path)
+        logger.info(f"Recording upstream traffic to {path}")
+        return cls(
+            path,
+            max_bytes=int(os.getenv("TRAFFIC_RECORD_MAX_BYTES") or 50 * 1024 * 1024),
+            backup_count=int(os.getenv("TRAFFIC_RECORD_BACKUP_COUNT") or 5),
+            sample_rate=float(os.getenv("TRAFFIC_RECORD_SAMPLE_RATE") or 1.0),
+            salt=os.getenv("TRAFFIC_RECORD_SALT") or "",
+            queue_size=int(os.getenv("TRAFFIC_RECORD_QUEUE_SIZE") or 10000),
+        )
+
+    def stop(self) -> None:
+        """Write the queued records and stop the writer thread. Called at server shutdown."""
+        self.writer.removeHandler(self.queue_handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        if self.queue_handler.dropped:
+            logger.warning(f"Dropped {self.queue_handler.dropped} traffic records because the queue was full.")
+
+    def record(
+        self,
+        params: dict | None,
+        response_data: dict | str | None,
+        status_code: int | None,
+        started_at: float,
+        duration: float,
+    ) -> None:
+        """
+        Queue one upstream call for the writer thread.
+
+        Args:
+            params (dict | None): JSON-RPC request sent upstream.
+            response_data (dict | str | None): Decoded response body, None if no response arrived.
+            status_code (int | None): HTTP status, None if the call failed before a response.
+            started_at (float): Wall-clock start time of the upstream call.
+            duration (float): Seconds spent on the upstream call, including retries.
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        self.writer.info({
+            "ts": round(started_at, 6),
+            "duration_ms": round(duration * 1000, 3),
+            "status": status_code,
+            "request": params,
+            "response": response_data,
+        })
+
+
+_recorder: TrafficRecorder | None = None
+_recorder_loaded = False
+
+
+def get_recorder() -> TrafficRecorder | None:
+    """Return the process-wide recorder, configured from the environment on first use."""
+    global _recorder, _recorder_loaded
+    if not _recorder_loaded:
+        _recorder = TrafficRecorder.from_env()
+        _recorder_loaded = True
+    return _recorder
+
+
+def stop_recorder() -> None:
+    """Flush and stop the process-wide recorder, if one was started."""
+    global _recorder, _recorder_loaded
+    if _recorder is not None:
+        _recorder.stop()
+    _recorder, _recorder_loaded = None, False
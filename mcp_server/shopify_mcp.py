@@ -5,16 +5,23 @@ performing the cart operations.
 """
 
 import logging, json
+from contextlib import asynccontextmanager
 
 
 from dotenv import load_dotenv
 from fastmcp import Context, FastMCP, settings
 from typing import Any, Dict, Optional, Union, List
-from starlette.responses import JSONResponse
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse, Response
     
 
 from mcp_server.client import ShopifyClient
-from mcp_server.utils import setup_logging, get_cart_html, get_products_html
+from mcp_server.compression import CompressionMiddleware, precompress_assets
+from mcp_server.deadline import Deadline
+from mcp_server.models import Cart, Product
+from mcp_server.readiness import LoadSheddingMiddleware, ReadinessMonitor
+from mcp_server.recorder import stop_recorder
+from mcp_server.utils import UI_ASSETS, setup_logging, get_cart_html, get_products_html
 from mcp_ui_server import create_ui_resource
 from mcp_ui_server.core import UIResource
 from mcp_ui_server.exceptions import InvalidURIError
@@ -26,12 +33,31 @@ setup_logging()
 
 logger = logging.getLogger(__name__)
 
+readiness_monitor = ReadinessMonitor()
+ui_assets = precompress_assets(UI_ASSETS)
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """
+    Start the readiness monitor; close the shared upstream pool and flush the traffic recorder on shutdown.
+    """
+    readiness_monitor.start()
+    try:
+        yield {}
+    finally:
+        await readiness_monitor.stop()
+        await ShopifyClient.close_session()
+        stop_recorder()
+
+
 settings.json_response = True
 mcp = FastMCP(
     "Shopify Storefront",
     on_duplicate_tools="error",
     instructions="This server provides Shopify tools.",
-    auth=None
+    auth=None,
+    lifespan=lifespan,
 )
 
 logger.info(f"MCP server started!")
@@ -53,8 +79,9 @@ async def search_products(query: str, ctx: Context) -> Union[List[Union[UIResour
     }
     result = {}
     status_code = 200
-    async with ShopifyClient() as api_client:
-        result, status_code = await api_client.make_request(tool_name, arguments)
+    deadline = Deadline.for_tool(ctx, "search_products")
+    async with ShopifyClient(enable_retries=True) as api_client:
+        result, status_code = await api_client.make_request(tool_name, arguments, deadline=deadline)
     
     if "error" in result:
         logger.error(f"Error in search_products: {result.get("error_message", "Error fetching products.")}")
@@ -71,7 +98,7 @@ async def search_products(query: str, ctx: Context) -> Union[List[Union[UIResour
             "uri": f"ui://Shopify/products/",
             "content": {
                 "type": "rawHtml",
-                "htmlString": get_products_html(products['products'])
+                "htmlString": get_products_html([Product.from_dict(p) for p in products['products']])
             },
             "encoding": "text"
         })
@@ -102,8 +129,9 @@ async def get_product_details_by_id(product_id: str, ctx: Context) -> Dict[str,
     }
     result = {}
     status_code = 200
-    async with ShopifyClient() as api_client:
-        result, status_code = await api_client.make_request(tool_name, arguments)
+    deadline = Deadline.for_tool(ctx, "get_product_details_by_id")
+    async with ShopifyClient(enable_retries=True) as api_client:
+        result, status_code = await api_client.make_request(tool_name, arguments, deadline=deadline)
     
     if "error" in result:
         logger.error(f"Error in get_product_by_id: {result.get("error_message", "Error fetching product by ID.")}")
@@ -136,8 +164,9 @@ async def add_to_cart(product_variant_id: str, ctx: Context, cart_id: Optional[s
     }
     result = {}
     status_code = 200
+    deadline = Deadline.for_tool(ctx, "add_to_cart")
     async with ShopifyClient() as api_client:
-        result, status_code = await api_client.make_request(tool_name, arguments)
+        result, status_code = await api_client.make_request(tool_name, arguments, deadline=deadline)
     
     if "error" in result:
         logger.error(f"Error in create_cart: {result.get("error_message", "Error creating the cart.")}")
@@ -153,7 +182,7 @@ async def add_to_cart(product_variant_id: str, ctx: Context, cart_id: Optional[s
                 "uri": f"ui://Shopify/cart/",
                 "content": {
                     "type": "rawHtml",
-                    "htmlString": get_cart_html(cart)
+                    "htmlString": get_cart_html(Cart.from_dict(cart))
                 },
                 "encoding": "text"
             })
@@ -184,8 +213,9 @@ async def get_cart(cart_id: str, ctx: Context) -> Union[List[Union[UIResource, D
     }
     result = {}
     status_code = 200
-    async with ShopifyClient() as api_client:
-        result, status_code = await api_client.make_request(tool_name, arguments)
+    deadline = Deadline.for_tool(ctx, "get_cart")
+    async with ShopifyClient(enable_retries=True) as api_client:
+        result, status_code = await api_client.make_request(tool_name, arguments, deadline=deadline)
     
     if "error" in result:
         logger.error(f"Error in get_cart: {result.get("error_message", "Error getting the cart.")}")
@@ -201,7 +231,7 @@ async def get_cart(cart_id: str, ctx: Context) -> Union[List[Union[UIResource, D
                 "uri": f"ui://Shopify/cart/",
                 "content": {
                     "type": "rawHtml",
-                    "htmlString": get_cart_html(cart)
+                    "htmlString": get_cart_html(Cart.from_dict(cart))
                 },
                 "encoding": "text"
             })
@@ -224,10 +254,55 @@ async def health_check(request):
     return JSONResponse(status_code=200, content={"status": "healthy", "service": "Shopify-storefront-mcp-server"})
 
 
+@mcp.custom_route("/ready", methods=["GET"])
+async def readiness_check(request):
+    """
+    Check whether the server should receive traffic, using cached upstream and load signals.
+    """
+    snapshot = readiness_monitor.snapshot()
+    if snapshot["status"] != "ready":
+        return JSONResponse(
+            status_code=503,
+            content=snapshot,
+            headers={"Retry-After": str(readiness_monitor.retry_after)},
+        )
+    return JSONResponse(status_code=200, content=snapshot)
+
+
+@mcp.custom_route("/ui/assets/{name}", methods=["GET"])
+async def ui_asset(request):
+    """
+    Serve the static CSS/JS of the UI templates, pre-compressed at startup.
+    """
+    asset = ui_assets.get(request.path_params["name"])
+    if asset is None:
+        return JSONResponse(status_code=404, content={"error": True, "error_message": "Asset not found."})
+
+    body, encoding = asset.select(request.headers.get("accept-encoding", ""))
+    headers = {
+        "Cache-Control": "public, max-age=86400",
+        "ETag": asset.etag(encoding),
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+    if headers["ETag"] in if_none_match or "*" in if_none_match:
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=asset.media_type, headers=headers)
+
+
 def run_server():
     logger.info("Starting MCP development server.")
     mcp.run(transport="http", port=9300)
 
 
 # Create ASGI application
-app = mcp.http_app(transport="http")
+app = mcp.http_app(
+    transport="http",
+    middleware=[
+        Middleware(CompressionMiddleware),
+        Middleware(LoadSheddingMiddleware, monitor=readiness_monitor),
+    ],
+)
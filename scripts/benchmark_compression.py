@@ -0,0 +1,67 @@
+"""
+Measure bytes-on-wire and CPU cost of response compression per response size class.
+
+Builds tool responses shaped like the ones the server sends (inline UI HTML plus
+product/cart JSON) and compresses them with every available encoding and level.
+
+Usage:
+    python scripts/benchmark_compression.py [--iterations 50]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fixtures import sample_cart, sample_product
+from mcp_server.compression import available_encodings, compress
+from mcp_server.models import Cart, Product
+from mcp_server.utils import get_cart_html, get_products_html
+
+LEVELS = {"zstd": [1, 3, 9], "br": [1, 4, 11], "gzip": [1, 6, 9]}
+
+
+def tool_response(html: str, payload) -> bytes:
+    """Serialize a response the way the HTTP transport does for a UI resource plus JSON."""
+    content = [
+        {"type": "resource", "resource": {"uri": "ui://Shopify/products/", "mimeType": "text/html", "text": html}},
+        {"type": "text", "text": json.dumps(payload)},
+    ]
+    return json.dumps({"jsonrpc": "2.0", "id": 1, "result": {"content": content, "isError": False}}).encode()
+
+
+def size_classes() -> dict[str, bytes]:
+    classes = {}
+    for count in (1, 10, 50):
+        products = [sample_product(i) for i in range(count)]
+        html = get_products_html([Product.from_dict(p) for p in products])
+        classes[f"search_products x{count}"] = tool_response(html, products)
+    for lines in (1, 10):
+        cart = sample_cart(lines)
+        classes[f"get_cart x{lines}"] = tool_response(get_cart_html(Cart.from_dict(cart)), cart)
+    return classes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'response':<22} {'encoding':<10} {'bytes':>9} {'ratio':>7} {'cpu ms':>8}")
+    for name, payload in size_classes().items():
+        print(f"{name:<22} {'identity':<10} {len(payload):>9} {1.0:>7.2f} {0.0:>8.3f}")
+        for encoding in available_encodings():
+            for level in LEVELS[encoding]:
+                started = time.process_time()
+                for _ in range(args.iterations):
+                    compressed = compress(payload, encoding, level)
+                cpu_ms = (time.process_time() - started) * 1000 / args.iterations
+                ratio = len(compressed) / len(payload)
+                print(f"{'':<22} {f'{encoding}-{level}':<10} {len(compressed):>9} {ratio:>7.2f} {cpu_ms:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
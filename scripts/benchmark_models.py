@@ -0,0 +1,74 @@
+"""
+Measure memory held per cached product and cart as decoded dicts versus typed models.
+
+Decodes the same upstream JSON into plain dicts and into the slotted models in
+`mcp_server.models`, keeps the results alive as a cache would, and reports the
+bytes allocated per entry with tracemalloc, plus decode and serialize time.
+
+Usage:
+    python scripts/benchmark_models.py [--count 1000]
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fixtures import sample_cart, sample_product
+from mcp_server.models import Cart, Product
+
+
+def measure(decode, payloads: list[str]) -> tuple[float, float]:
+    """Return (bytes retained per entry, decode microseconds per entry)."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    cache = [decode(payload) for payload in payloads]
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Subtract the cache list itself, which is the same for both variants.
+    retained -= sys.getsizeof(cache)
+    return retained / len(payloads), elapsed * 1e6 / len(payloads)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1000)
+    args = parser.parse_args()
+
+    cases = {
+        "product": (
+            [json.dumps(sample_product(i)) for i in range(args.count)],
+            Product,
+        ),
+        "cart (5 lines)": (
+            [json.dumps(sample_cart(5)) for _ in range(args.count)],
+            Cart,
+        ),
+    }
+
+    print(f"{'entry':<16} {'variant':<8} {'bytes/entry':>12} {'decode us':>10} {'to_dict us':>11}")
+    for name, (payloads, model) in cases.items():
+        dict_bytes, dict_us = measure(json.loads, payloads)
+        model_bytes, model_us = measure(lambda payload: model.from_dict(json.loads(payload)), payloads)
+
+        models = [model.from_dict(json.loads(payload)) for payload in payloads]
+        started = time.perf_counter()
+        for item in models:
+            item.to_dict()
+        to_dict_us = (time.perf_counter() - started) * 1e6 / len(models)
+
+        print(f"{name:<16} {'dict':<8} {dict_bytes:>12.0f} {dict_us:>10.2f} {'-':>11}")
+        print(f"{'':<16} {'model':<8} {model_bytes:>12.0f} {model_us:>10.2f} {to_dict_us:>11.2f}")
+        print(f"{'':<16} {'saving':<8} {1 - model_bytes / dict_bytes:>12.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Sample upstream payloads shaped like the Shopify storefront MCP responses, used by the benchmarks.
+"""
+
+
+def sample_product(i: int) -> dict:
+    return {
+        "product_id": f"gid://shopify/Product/{1000 + i}",
+        "title": f"Organic Cotton Baby Onesie {i}",
+        "description": "Soft, breathable organic cotton onesie with snap closures. " * 3,
+        "url": f"https://example.myshopify.com/products/onesie-{i}",
+        "image_url": f"https://cdn.shopify.com/s/files/1/0000/0001/products/onesie-{i}.jpg",
+        "image_alt_text": f"Onesie {i}",
+        "price_range": {"min": "19.99", "max": "24.99", "currency": "USD"},
+        "variants": [
+            {
+                "variant_id": f"gid://shopify/ProductVariant/{5000 + i * 3 + v}",
+                "title": size,
+                "price": "19.99",
+                "currency": "USD",
+                "available": True,
+            }
+            for v, size in enumerate(["0-3M", "3-6M", "6-12M"])
+        ],
+    }
+
+
+def sample_cart(lines: int) -> dict:
+    return {
+        "id": "gid://shopify/Cart/c1-abcdef",
+        "checkout_url": "https://example.myshopify.com/cart/c/c1-abcdef",
+        "total_quantity": lines,
+        "cost": {
+            "subtotal_amount": {"amount": f"{lines * 19.99:.2f}", "currency": "USD"},
+            "total_amount": {"amount": f"{lines * 19.99:.2f}", "currency": "USD"},
+        },
+        "lines": [
+            {
+                "id": f"gid://shopify/CartLine/{i}",
+                "quantity": 1,
+                "cost": {"total_amount": {"amount": "19.99", "currency": "USD"}},
+                "merchandise": {
+                    "id": f"gid://shopify/ProductVariant/{5000 + i}",
+                    "title": "0-3M",
+                    "product": {"id": f"gid://shopify/Product/{1000 + i}", "title": f"Organic Cotton Baby Onesie {i}"},
+                },
+            }
+            for i in range(lines)
+        ],
+    }
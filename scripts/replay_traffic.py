@@ -0,0 +1,223 @@
+"""
+Replay recorded production traffic against the server and report latency distributions.
+
+Serves the recordings written by `mcp_server.recorder` as a local stand-in for
+the Shopify store (each response delayed by its recorded upstream latency),
+starts `server:app` under uvicorn pointed at the stand-in, then issues the
+matching MCP tool calls with their recorded inter-arrival times divided by
+each speed factor.
+
+Usage:
+    python scripts/replay_traffic.py traffic.*.jsonl [--speeds 1,5,20] [--limit 500]
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+import uvicorn
+from fastmcp import Client
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from mcp_server.recorder import sanitize
+
+
+def upstream_to_mcp_call(request: dict) -> tuple[str, dict] | None:
+    """Map a recorded upstream JSON-RPC request to the MCP tool call that produced it."""
+    params = request.get("params") or {}
+    name, arguments = params.get("name"), params.get("arguments") or {}
+    if name == "search_shop_catalog":
+        return "search_products", {"query": arguments.get("query", "")}
+    if name == "get_product_details":
+        return "get_product_details_by_id", {"product_id": arguments.get("product_id", "")}
+    if name == "update_cart" and arguments.get("add_items"):
+        item = arguments["add_items"][0]
+        return "add_to_cart", {
+            "product_variant_id": item.get("product_variant_id", ""),
+            "quantity": item.get("quantity", 1),
+        }
+    if name == "get_cart":
+        return "get_cart", {"cart_id": arguments.get("cart_id", "")}
+    return None
+
+
+def request_key(request: dict) -> tuple[str, str]:
+    params = request.get("params") or {}
+    return params.get("name", ""), json.dumps(params.get("arguments") or {}, sort_keys=True)
+
+
+def load_recordings(paths: list[str], limit: int | None) -> list[dict]:
+    """Load recordings (e.g. one per worker) and their rotated backups, merged oldest first."""
+    records = []
+    for path in paths:
+        # RotatingFileHandler keeps the newest backup as .1, so higher suffixes are older.
+        backups = [f for f in glob.glob(f"{glob.escape(path)}.*") if f.rsplit(".", 1)[1].isdigit()]
+        backups.sort(key=lambda f: int(f.rsplit(".", 1)[1]), reverse=True)
+        for file in backups + [path]:
+            with open(file, encoding="utf-8") as fh:
+                records.extend(json.loads(line) for line in fh if line.strip())
+    records.sort(key=lambda r: r["ts"])
+    return records[:limit] if limit else records
+
+
+class StandInUpstream:
+    """Serves recorded responses, matched by tool name and sanitized arguments."""
+
+    def __init__(self, records: list[dict]):
+        self.by_key = defaultdict(list)
+        self.by_tool = defaultdict(list)
+        self.cursor = defaultdict(int)
+        for record in records:
+            name, arguments = request_key(record["request"])
+            self.by_key[(name, arguments)].append(record)
+            self.by_tool[name].append(record)
+        self.app = Starlette(routes=[Route("/api/mcp", self.handle, methods=["POST"])])
+
+    async def handle(self, request: Request) -> Response:
+        body = sanitize(await request.json())
+        if body.get("method") != "tools/call":
+            return JSONResponse({"jsonrpc": "2.0", "id": body.get("id"), "result": {"tools": []}})
+
+        key = request_key(body)
+        candidates = self.by_key.get(key) or self.by_tool.get(key[0])
+        if not candidates:
+            return JSONResponse({"error": f"No recording for {key[0]}"}, status_code=404)
+        record = candidates[self.cursor[key] % len(candidates)]
+        self.cursor[key] += 1
+
+        await asyncio.sleep(record["duration_ms"] / 1000)
+        if record["status"] is None:
+            return JSONResponse({"error": "Recorded call failed without a response"}, status_code=504)
+        if isinstance(record["response"], str):
+            return Response(record["response"], status_code=record["status"])
+        return JSONResponse(record["response"], status_code=record["status"])
+
+
+async def wait_until_healthy(url: str, server: subprocess.Popen, timeout: float = 30) -> None:
+    started = time.monotonic()
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode} before becoming healthy")
+            try:
+                if (await client.get(f"{url}/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become healthy within {timeout}s")
+
+
+async def replay(calls: list[tuple[float, str, dict]], server_url: str, speed: float) -> dict:
+    """Issue the calls at their recorded offsets divided by speed and collect latencies per tool."""
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+
+    async with Client(f"{server_url}/mcp") as client:
+        async def call(offset: float, tool: str, arguments: dict) -> None:
+            await asyncio.sleep(max(0.0, offset / speed - (time.monotonic() - started)))
+            call_started = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, arguments, raise_on_error=False)
+                failed = result.is_error or (isinstance(result.data, dict) and bool(result.data.get("error")))
+            except Exception:
+                failed = True
+            latencies[tool].append((time.perf_counter() - call_started) * 1000)
+            if failed:
+                errors[tool] += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(call(offset, tool, arguments) for offset, tool, arguments in calls))
+        wall = time.monotonic() - started
+
+    return {"latencies": latencies, "errors": errors, "wall": wall}
+
+
+def percentile(values: list[float], q: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def report(speed: float, results: dict) -> None:
+    all_latencies = [ms for values in results["latencies"].values() for ms in values]
+    print(f"\n{speed:g}x speed: {len(all_latencies)} calls in {results['wall']:.1f}s")
+    print(f"{'tool':<28} {'calls':>6} {'errors':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    rows = sorted(results["latencies"].items()) + [("all", all_latencies)]
+    for tool, values in rows:
+        if not values:
+            continue
+        errors = sum(results["errors"].values()) if tool == "all" else results["errors"][tool]
+        print(
+            f"{tool:<28} {len(values):>6} {errors:>7} {percentile(values, 50):>8.1f} "
+            f"{percentile(values, 90):>8.1f} {percentile(values, 99):>8.1f} {max(values):>8.1f}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "recordings",
+        nargs="+",
+        help="TRAFFIC_RECORD_PATH files, one per worker; rotated backups are included.",
+    )
+    parser.add_argument("--speeds", default="1,5,20", help="Comma-separated replay speed factors.")
+    parser.add_argument("--limit", type=int, default=None, help="Replay at most this many recorded calls.")
+    parser.add_argument("--upstream-port", type=int, default=9391)
+    parser.add_argument("--server-port", type=int, default=9390)
+    args = parser.parse_args()
+
+    records = load_recordings(args.recordings, args.limit)
+    calls = []
+    for record in records:
+        mapped = upstream_to_mcp_call(record["request"])
+        if mapped:
+            calls.append((record["ts"] - records[0]["ts"], *mapped))
+    if not calls:
+        sys.exit(f"No replayable tool calls found in {', '.join(args.recordings)}")
+    print(f"Loaded {len(records)} recorded upstream calls, {len(calls)} replayable tool calls.")
+
+    stand_in = StandInUpstream(records)
+    upstream = uvicorn.Server(uvicorn.Config(stand_in.app, port=args.upstream_port, log_level="warning"))
+    upstream_task = asyncio.create_task(upstream.serve())
+
+    env = {
+        **os.environ,
+        "SHOPIFY_API_URL": f"http://127.0.0.1:{args.upstream_port}/api/mcp",
+        "TRAFFIC_RECORD_PATH": "",
+        "FASTMCP_LOG_LEVEL": os.getenv("FASTMCP_LOG_LEVEL", "WARNING"),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(args.server_port), "--lifespan", "on"],
+        cwd=ROOT,
+        env=env,
+    )
+    server_url = f"http://127.0.0.1:{args.server_port}"
+    try:
+        await wait_until_healthy(server_url, server)
+        for speed in (float(s) for s in args.speeds.split(",")):
+            report(speed, await replay(calls, server_url, speed))
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+        upstream.should_exit = True
+        await upstream_task
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,161 @@
+"""
+Tests for encoding negotiation, the compression middleware and pre-compressed UI assets.
+"""
+
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from mcp_server.compression import CompressionMiddleware, negotiate_encoding, precompress_assets
+
+LARGE = "x" * 4096
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        ("gzip, br", "br"),
+        ("gzip;q=1, br;q=0.5", "gzip"),
+        ("br;q=0, gzip", "gzip"),
+        ("br;Q=0, gzip", "gzip"),
+        ("br;foo=1;q=0, gzip", "gzip"),
+        ("br ; q = 0 , gzip", "gzip"),
+        ("*", "br"),
+        ("*, br;q=0", "gzip"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate_encoding(accept, expected):
+    assert negotiate_encoding(accept, ["br", "gzip"]) == expected
+
+
+def make_client(monkeypatch) -> TestClient:
+    monkeypatch.setenv("COMPRESSION_ENCODINGS", "gzip")
+    monkeypatch.setenv("COMPRESSION_MIN_SIZE_IN_BYTES", "1024")
+
+    async def large(request):
+        return PlainTextResponse(LARGE)
+
+    async def small(request):
+        return PlainTextResponse("small")
+
+    async def stream(request):
+        return Response(LARGE, media_type="text/event-stream")
+
+    async def encoded(request):
+        return Response(gzip.compress(LARGE.encode()), headers={"Content-Encoding": "gzip"})
+
+    async def not_modified(request):
+        return Response(status_code=304, headers={"ETag": '"abc"', "Vary": "Accept-Encoding"})
+
+    async def varies(request):
+        return PlainTextResponse(LARGE, headers={"Vary": "Origin"})
+
+    app = Starlette(
+        routes=[
+            Route("/large", large),
+            Route("/small", small),
+            Route("/stream", stream),
+            Route("/encoded", encoded),
+            Route("/not-modified", not_modified),
+            Route("/varies", varies),
+        ],
+        middleware=[Middleware(CompressionMiddleware)],
+    )
+    return TestClient(app, headers={"Accept-Encoding": "gzip"})
+
+
+def test_compresses_responses_above_the_threshold(monkeypatch):
+    response = make_client(monkeypatch).get("/large")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers.get_list("vary") == ["Accept-Encoding"]
+    assert int(response.headers["content-length"]) < len(LARGE)
+    assert response.text == LARGE
+
+
+def test_leaves_responses_below_the_threshold_untouched(monkeypatch):
+    response = make_client(monkeypatch).get("/small")
+
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+    assert response.headers["content-length"] == "5"
+
+
+@pytest.mark.parametrize("path", ["/stream", "/encoded"])
+def test_passes_event_streams_and_encoded_responses_through(monkeypatch, path):
+    response = make_client(monkeypatch).get(path)
+
+    assert response.headers.get("content-encoding") == ("gzip" if path == "/encoded" else None)
+    assert "vary" not in response.headers
+    assert response.text == LARGE
+
+
+def test_passes_not_modified_through(monkeypatch):
+    response = make_client(monkeypatch).get("/not-modified")
+
+    assert response.status_code == 304
+    assert "content-length" not in response.headers
+    assert response.headers.get_list("vary") == ["Accept-Encoding"]
+
+
+def test_keeps_existing_vary(monkeypatch):
+    response = make_client(monkeypatch).get("/varies")
+
+    assert response.headers.get_list("vary") == ["Origin, Accept-Encoding"]
+
+
+def test_assets_are_only_built_for_enabled_encodings(monkeypatch):
+    monkeypatch.setenv("COMPRESSION_ENCODINGS", "gzip")
+    asset = precompress_assets({"app.js": "console.log(1);"})["app.js"]
+
+    assert list(asset.variants) == ["gzip"]
+    assert asset.media_type == "text/javascript; charset=utf-8"
+
+
+def test_asset_route_tags_each_encoding_and_revalidates():
+    from mcp_server.shopify_mcp import app, ui_assets
+
+    client = TestClient(app)
+    asset = ui_assets["products.css"]
+    etags = set()
+
+    for encoding in [None, *asset.variants]:
+        headers = {"Accept-Encoding": encoding or "identity"}
+        response = client.get("/ui/assets/products.css", headers=headers)
+        etag = response.headers["etag"]
+        assert response.status_code == 200
+        assert response.headers.get("content-encoding") == encoding
+        assert etag == asset.etag(encoding)
+        etags.add(etag)
+
+        revalidated = client.get("/ui/assets/products.css", headers={**headers, "If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == etag
+        assert "content-length" not in revalidated.headers
+        assert revalidated.headers.get_list("vary") == ["Accept-Encoding"]
+
+    assert len(etags) == len(asset.variants) + 1
+
+    if asset.variants:
+        encoding = next(iter(asset.variants))
+        response = client.get(
+            "/ui/assets/products.css",
+            headers={"Accept-Encoding": "identity", "If-None-Match": asset.etag(encoding)},
+        )
+        assert response.status_code == 200
+
+
+def test_asset_route_returns_404_for_unknown_assets():
+    from mcp_server.shopify_mcp import app
+
+    response = TestClient(app).get("/ui/assets/missing.js")
+    assert response.status_code == 404
+    assert response.json()["error"] is True
@@ -0,0 +1,184 @@
+"""
+Tests for per-request deadlines and how ShopifyClient spends them.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from mcp_server.client import ShopifyClient
+from mcp_server.deadline import Deadline
+
+OK_BODY = {"jsonrpc": "2.0", "id": 1, "result": {"content": [{"type": "text", "text": "{}"}]}}
+
+
+@pytest.fixture(autouse=True)
+def upstream_env(monkeypatch):
+    monkeypatch.setenv("SHOPIFY_API_URL", "http://upstream.test/api/mcp")
+    monkeypatch.setenv("UPSTREAM_RETRY_BACKOFF_IN_SECONDS", "0.05")
+    monkeypatch.delenv("TRAFFIC_RECORD_PATH", raising=False)
+    ShopifyClient._slots = None
+    ShopifyClient._session = None
+    yield
+    ShopifyClient._slots = None
+    ShopifyClient._session = None
+
+
+def use_upstream(handler) -> None:
+    ShopifyClient._session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def make_ctx(timeout_ms=None, request=None):
+    meta = SimpleNamespace(timeoutMs=timeout_ms) if timeout_ms is not None else None
+    return SimpleNamespace(request_context=SimpleNamespace(meta=meta, request=request))
+
+
+def test_budget_comes_from_tool_config(monkeypatch):
+    monkeypatch.setenv("API_TIMEOUT_IN_SECONDS", "10")
+    monkeypatch.setenv("GET_CART_TIMEOUT_IN_SECONDS", "4")
+
+    assert Deadline.for_tool(make_ctx(), "get_cart").budget == 4
+    assert Deadline.for_tool(make_ctx(), "search_products").budget == 10
+
+
+def test_client_meta_can_only_shorten_budget(monkeypatch):
+    monkeypatch.setenv("API_TIMEOUT_IN_SECONDS", "10")
+
+    assert Deadline.for_tool(make_ctx(timeout_ms=2500), "get_cart").budget == 2.5
+    assert Deadline.for_tool(make_ctx(timeout_ms=60000), "get_cart").budget == 10
+    assert Deadline.for_tool(make_ctx(timeout_ms=-1), "get_cart").budget == 10
+
+
+def test_each_attempt_gets_an_equal_share_of_the_remaining_budget(monkeypatch):
+    monkeypatch.setenv("UPSTREAM_MAX_RETRIES", "2")
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        return httpx.Response(503 if len(timeouts) < 3 else 200, json=OK_BODY)
+
+    async def run():
+        use_upstream(handler)
+        client = ShopifyClient(enable_retries=True)
+        return await client.make_request("get_cart", {}, deadline=Deadline(3.0))
+
+    _, status_code = asyncio.run(run())
+
+    assert status_code == 200
+    assert len(timeouts) == 3
+    # First attempt gets a third of the budget, the second half of what is left, the last all of it.
+    assert timeouts[0] == pytest.approx(1.0, abs=0.05)
+    assert timeouts[1] == pytest.approx((3.0 - 0.05) / 2, abs=0.05)
+    assert timeouts[2] == pytest.approx(3.0 - 0.05 - 0.1, abs=0.05)
+
+
+def test_backoff_never_sleeps_past_the_deadline(monkeypatch):
+    monkeypatch.setenv("UPSTREAM_MAX_RETRIES", "2")
+    monkeypatch.setenv("UPSTREAM_RETRY_BACKOFF_IN_SECONDS", "5")
+
+    async def run():
+        use_upstream(lambda request: httpx.Response(503, json={"error": "down"}))
+        client = ShopifyClient(enable_retries=True)
+        started = time.monotonic()
+        result = await client.make_request("get_cart", {}, deadline=Deadline(0.3))
+        return result, time.monotonic() - started
+
+    (result, status_code), elapsed = asyncio.run(run())
+
+    assert status_code == 504
+    assert elapsed < 0.5
+
+
+def test_upstream_call_times_out_at_the_deadline():
+    async def handler(request):
+        await asyncio.sleep(5)
+        return httpx.Response(200, json=OK_BODY)
+
+    async def run():
+        use_upstream(handler)
+        started = time.monotonic()
+        result = await ShopifyClient().make_request("get_cart", {}, deadline=Deadline(0.2))
+        return result, time.monotonic() - started
+
+    (result, status_code), elapsed = asyncio.run(run())
+
+    assert status_code == 504
+    assert elapsed < 0.5
+    assert ShopifyClient.in_flight == 0
+
+
+def test_queueing_spends_at_most_its_share_of_the_budget(monkeypatch):
+    monkeypatch.setenv("UPSTREAM_MAX_CONNECTIONS", "1")
+    monkeypatch.setenv("UPSTREAM_QUEUE_BUDGET_FRACTION", "0.25")
+
+    async def handler(request):
+        await asyncio.sleep(1)
+        return httpx.Response(200, json=OK_BODY)
+
+    async def run():
+        use_upstream(handler)
+        holder = asyncio.create_task(ShopifyClient().make_request("get_cart", {}, deadline=Deadline(2)))
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        queued = await ShopifyClient().make_request("get_cart", {}, deadline=Deadline(0.8))
+        elapsed = time.monotonic() - started
+        await holder
+        return queued, elapsed
+
+    (result, status_code), elapsed = asyncio.run(run())
+
+    assert status_code == 504
+    assert "connection slot" in result["error_message"]
+    assert elapsed == pytest.approx(0.2, abs=0.1)
+
+
+def test_client_disconnect_cancels_the_upstream_call():
+    async def run():
+        cancelled = asyncio.Event()
+
+        async def handler(request):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return httpx.Response(200, json=OK_BODY)
+
+        async def receive():
+            await asyncio.sleep(0.1)
+            return {"type": "http.disconnect"}
+
+        use_upstream(handler)
+        deadline = Deadline(5, request=SimpleNamespace(receive=receive))
+        started = time.monotonic()
+        result = await ShopifyClient().make_request("get_cart", {}, deadline=deadline)
+        return result, time.monotonic() - started, cancelled.is_set(), ShopifyClient._slots._value
+
+    (result, status_code), elapsed, cancelled, free_slots = asyncio.run(run())
+
+    assert status_code == 499
+    assert elapsed < 0.5
+    assert cancelled
+    assert ShopifyClient.in_flight == 0
+    assert free_slots == 100
+
+
+def test_mcp_cancellation_propagates_and_releases_the_slot():
+    async def handler(request):
+        await asyncio.sleep(5)
+        return httpx.Response(200, json=OK_BODY)
+
+    async def run():
+        use_upstream(handler)
+        task = asyncio.create_task(ShopifyClient().make_request("get_cart", {}, deadline=Deadline(5)))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return ShopifyClient._slots._value
+
+    assert asyncio.run(run()) == 100
+    assert ShopifyClient.in_flight == 0
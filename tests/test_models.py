@@ -0,0 +1,72 @@
+"""
+Tests for the compact product and cart models.
+"""
+
+from mcp_server.models import Cart, CartLine, Product, Variant
+
+PRODUCT = {
+    "product_id": "gid://shopify/Product/1001",
+    "title": "Organic Cotton Baby Onesie",
+    "description": "Soft, breathable organic cotton onesie with snap closures.",
+    "url": "https://example.myshopify.com/products/onesie",
+    "image_url": "https://cdn.shopify.com/s/files/1/0000/0001/products/onesie.jpg",
+    "price_range": {"min": "19.99", "max": "24.99", "currency": "USD"},
+    "variants": [
+        {
+            "variant_id": "gid://shopify/ProductVariant/5001",
+            "title": "0-3M",
+            "price": "19.99",
+            "currency": "USD",
+            "available": False,
+        },
+    ],
+}
+
+CART = {
+    "id": "gid://shopify/Cart/c1-abcdef",
+    "checkout_url": "https://example.myshopify.com/cart/c/c1-abcdef",
+    "total_quantity": 2,
+    "cost": {
+        "subtotal_amount": {"amount": "39.98", "currency": "USD"},
+        "total_amount": {"amount": "39.98", "currency": "USD"},
+    },
+    "lines": [
+        {
+            "id": "gid://shopify/CartLine/1",
+            "quantity": 2,
+            "cost": {"total_amount": {"amount": "39.98", "currency": "USD"}},
+            "merchandise": {
+                "id": "gid://shopify/ProductVariant/5001",
+                "title": "0-3M",
+                "product": {"id": "gid://shopify/Product/1001", "title": "Organic Cotton Baby Onesie"},
+            },
+        },
+    ],
+}
+
+
+def test_full_payloads_round_trip():
+    product = Product.from_dict(PRODUCT)
+    assert product.first_variant.available is False
+    assert product.to_dict() == PRODUCT
+    assert Cart.from_dict(CART).to_dict() == CART
+
+
+def test_unused_fields_are_dropped():
+    product = Product.from_dict({**PRODUCT, "image_alt_text": "Onesie"})
+    assert "image_alt_text" not in product.to_dict()
+
+
+def test_absent_fields_stay_absent():
+    variant = Variant.from_dict({"variant_id": "gid://shopify/ProductVariant/1"})
+    assert variant.available is None
+    assert variant.to_dict() == {"variant_id": "gid://shopify/ProductVariant/1"}
+
+    cart = Cart.from_dict({"id": "gid://shopify/Cart/1", "lines": [{"id": "gid://shopify/CartLine/1"}]})
+    assert cart.total_amount is None and cart.total_quantity is None
+    assert cart.to_dict() == {"id": "gid://shopify/Cart/1", "lines": [{"id": "gid://shopify/CartLine/1"}]}
+
+
+def test_unparseable_quantity_is_none():
+    assert CartLine.from_dict({"quantity": "two"}).quantity is None
+    assert CartLine.from_dict({"quantity": "2"}).quantity == 2
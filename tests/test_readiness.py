@@ -0,0 +1,157 @@
+"""
+Tests for readiness signals, the /ready route and load shedding.
+"""
+
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from mcp_server.client import ShopifyClient
+from mcp_server.readiness import LoadSheddingMiddleware, ReadinessMonitor
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    monkeypatch.setenv("SHED_MAX_IN_FLIGHT", "2")
+    monkeypatch.setenv("SHED_MAX_EVENT_LOOP_LAG_IN_MS", "100")
+    monkeypatch.setenv("SHED_MAX_POOL_SATURATION", "0.5")
+    monkeypatch.setenv("UPSTREAM_MAX_CONNECTIONS", "10")
+    monkeypatch.setenv("READINESS_MAX_PROBE_LATENCY_IN_SECONDS", "1")
+    monkeypatch.setenv("READINESS_PROBE_FAILURE_THRESHOLD", "2")
+    monkeypatch.setenv("SHED_RETRY_AFTER_IN_SECONDS", "7")
+    monkeypatch.setattr(ShopifyClient, "in_flight", 0)
+    monitor = ReadinessMonitor()
+    monitor.record_probe(0.1)
+    return monitor
+
+
+def make_app(monitor: ReadinessMonitor) -> Starlette:
+    seen = {}
+
+    async def ok(request):
+        seen["in_flight"] = monitor.in_flight
+        return PlainTextResponse("ok")
+
+    async def boom(request):
+        raise RuntimeError("boom")
+
+    app = Starlette(
+        routes=[
+            Route("/mcp", ok, methods=["GET", "POST"]),
+            Route("/fail", boom, methods=["POST"]),
+            Route("/health", ok),
+            Route("/ready", ok),
+            Route("/ui/assets/{name}", ok),
+        ],
+        middleware=[Middleware(LoadSheddingMiddleware, monitor=monitor)],
+    )
+    app.state.seen = seen
+    return app
+
+
+def test_admits_when_every_signal_is_below_its_threshold(monitor):
+    assert monitor.shed_reason() is None
+
+
+@pytest.mark.parametrize(
+    ("signal", "reason"),
+    [
+        (lambda m: setattr(m, "in_flight", 2), "too many in-flight requests"),
+        (lambda m: setattr(m, "loop_lag_ms", 150.0), "event loop lag above threshold"),
+        (lambda m: setattr(ShopifyClient, "in_flight", 5), "upstream pool saturated"),
+    ],
+)
+def test_local_signals_shed_immediately(monitor, signal, reason):
+    signal(monitor)
+    assert monitor.shed_reason() == reason
+
+
+def test_upstream_failures_shed_only_after_the_threshold(monitor):
+    monitor.record_probe(5.0, "ReadTimeout")
+    assert monitor.shed_reason() is None
+
+    monitor.record_probe(5.0, "ReadTimeout")
+    assert monitor.shed_reason() == "upstream store unreachable"
+
+    monitor.record_probe(0.1)
+    assert monitor.shed_reason() is None
+
+
+def test_slow_probes_shed_only_after_the_threshold(monitor):
+    monitor.record_probe(2.0)
+    assert monitor.shed_reason() is None
+
+    monitor.record_probe(2.0)
+    assert monitor.shed_reason() == "upstream store latency above threshold"
+
+
+def test_snapshot_is_not_ready_until_the_first_probe():
+    snapshot = ReadinessMonitor().snapshot()
+    assert snapshot["status"] == "not_ready"
+    assert snapshot["reason"] == "upstream probe pending"
+
+
+def test_snapshot_reports_ready(monitor):
+    snapshot = monitor.snapshot()
+    assert snapshot["status"] == "ready"
+    assert snapshot["reason"] is None
+    assert snapshot["upstream"]["ok"] is True
+    assert snapshot["pool_size"] == 10
+
+
+def test_ready_route_returns_503_with_retry_after(monkeypatch):
+    from mcp_server.shopify_mcp import app, readiness_monitor
+
+    monkeypatch.setattr(readiness_monitor, "retry_after", 7)
+    monkeypatch.setattr(readiness_monitor, "probe_failure_threshold", 1)
+    for name in ("probe_failures", "probe_ok", "probe_error", "probe_latency", "probe_checked_at"):
+        monkeypatch.setattr(readiness_monitor, name, getattr(readiness_monitor, name))
+    readiness_monitor.probe_failures = 0
+    client = TestClient(app)
+
+    readiness_monitor.record_probe(0.1)
+    assert client.get("/ready").status_code == 200
+
+    readiness_monitor.record_probe(5.0, "ConnectError")
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
+    assert response.json()["reason"] == "upstream store unreachable"
+
+
+def test_middleware_sheds_with_503_and_retry_after(monitor):
+    monitor.loop_lag_ms = 500.0
+    response = TestClient(make_app(monitor)).post("/mcp")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"error": True, "error_message": "Service overloaded: event loop lag above threshold"}
+
+
+@pytest.mark.parametrize("path", ["/health", "/ready", "/ui/assets/products.css"])
+def test_probes_and_assets_are_never_shed(monitor, path):
+    monitor.loop_lag_ms = 500.0
+    assert TestClient(make_app(monitor)).get(path).status_code == 200
+
+
+def test_only_posts_count_as_in_flight(monitor):
+    app = make_app(monitor)
+    client = TestClient(app)
+
+    client.get("/mcp")
+    assert app.state.seen["in_flight"] == 0
+
+    client.post("/mcp")
+    assert app.state.seen["in_flight"] == 1
+    assert monitor.in_flight == 0
+
+
+def test_in_flight_is_released_when_the_app_raises(monitor):
+    client = TestClient(make_app(monitor), raise_server_exceptions=False)
+
+    assert client.post("/fail").status_code == 500
+    assert monitor.in_flight == 0
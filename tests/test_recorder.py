@@ -0,0 +1,148 @@
+"""
+Tests for sanitizing and recording upstream traffic.
+"""
+
+import json
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from mcp_server import recorder as recorder_module
+from mcp_server.recorder import REDACTED_PREFIX, TrafficRecorder, record_path, sanitize
+
+CART_ID = "gid://shopify/Cart/c1-abcdef"
+
+ADDRESS = {
+    "first_name": "Ada",
+    "last_name": "Lovelace",
+    "company": "Analytical Engines",
+    "address1": "12 St James's Square",
+    "city": "London",
+    "province": "England",
+    "province_code": "ENG",
+    "country_code": "GB",
+    "zip": "SW1Y 4JH",
+}
+
+
+def cart_response() -> dict:
+    cart = {
+        "id": CART_ID,
+        "checkout_url": "https://example.myshopify.com/cart/c/c1-abcdef",
+        "buyer_identity": {"email": "ada@example.com", "country_code": "GB"},
+        "delivery": {"addresses": [{"name": "Ada Lovelace", **ADDRESS}]},
+        "attributes": [{"key": "gift_message", "value": "Happy birthday Ada"}],
+        "discount_codes": [{"code": "ADA-VIP-2026", "applicable": True}],
+        "lines": [{"id": "gid://shopify/CartLine/1", "quantity": 1}],
+    }
+    return {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "result": {"content": [{"type": "text", "text": json.dumps({"cart": cart})}]},
+    }
+
+
+def test_sanitize_redacts_json_encoded_text():
+    sanitized = sanitize(cart_response())
+    text = sanitized["result"]["content"][0]["text"]
+    cart = json.loads(text)["cart"]
+
+    for sensitive in ("Ada", "Lovelace", "London", "ENG", "SW1Y", "ADA-VIP", "birthday", "c1-abcdef"):
+        assert sensitive not in text
+    for key in ("id", "checkout_url", "buyer_identity", "delivery", "attributes", "discount_codes"):
+        assert cart[key].startswith(REDACTED_PREFIX)
+    assert cart["lines"][0]["id"].startswith(REDACTED_PREFIX)
+    assert cart["lines"][0]["quantity"] == 1
+
+
+def test_sanitize_is_idempotent():
+    once = sanitize(cart_response(), salt="s")
+    assert sanitize(once, salt="s") == once
+
+
+def test_sanitize_keeps_ids_stable_across_records():
+    request = {"params": {"name": "get_cart", "arguments": {"cart_id": CART_ID}}}
+    response = json.loads(sanitize(cart_response())["result"]["content"][0]["text"])
+
+    assert sanitize(request)["params"]["arguments"]["cart_id"] == response["cart"]["id"]
+
+
+def test_sanitize_keeps_tool_names_and_product_data():
+    request = {
+        "method": "tools/call",
+        "params": {"name": "search_shop_catalog", "arguments": {"query": "onesie", "context": "baby"}},
+    }
+    assert sanitize(request) == request
+
+
+def test_record_path_always_includes_the_pid():
+    assert record_path("traffic.{pid}.jsonl") == f"traffic.{os.getpid()}.jsonl"
+    assert record_path("logs/traffic.jsonl") == f"logs/traffic.{os.getpid()}.jsonl"
+    assert record_path("traffic") == f"traffic.{os.getpid()}"
+
+
+def _record_in_worker(path: str) -> None:
+    recorder = TrafficRecorder(record_path(path), 1024 * 1024, 1, 1.0, "")
+    recorder.record({"pid": os.getpid()}, None, 200, started_at=0.0, duration=0.0)
+    recorder.stop()
+
+
+@pytest.mark.parametrize(
+    ("name", "expected"),
+    [("traffic.jsonl", "traffic.{pid}.jsonl"), ("traffic-{pid}.jsonl", "traffic-{pid}.jsonl")],
+)
+def test_workers_never_share_a_recording(tmp_path, name, expected):
+    # Workers started by `uvicorn --workers` or gunicorn are forked without WEB_CONCURRENCY.
+    fork = multiprocessing.get_context("fork")
+    workers = [fork.Process(target=_record_in_worker, args=(str(tmp_path / name),)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert [worker.exitcode for worker in workers] == [0, 0, 0]
+    written = {}
+    for file in tmp_path.iterdir():
+        [line] = file.read_text().splitlines()
+        written[file.name] = json.loads(line)["request"]["pid"]
+    assert written == {expected.format(pid=worker.pid): worker.pid for worker in workers}
+
+
+def test_recorder_sanitizes_and_writes_off_the_calling_thread(tmp_path, monkeypatch):
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(str(path), max_bytes=1024 * 1024, backup_count=1, sample_rate=1.0, salt="")
+    threads = set()
+
+    def tracking_sanitize(data, salt=""):
+        threads.add(threading.get_ident())
+        return sanitize(data, salt)
+
+    monkeypatch.setattr(recorder_module, "sanitize", tracking_sanitize)
+    request = {"params": {"name": "get_cart", "arguments": {"cart_id": CART_ID}}}
+    recorder.record(request, cart_response(), 200, started_at=1.0, duration=0.25)
+    recorder.stop()
+
+    [line] = path.read_text().splitlines()
+    record = json.loads(line)
+    assert record["status"] == 200 and record["duration_ms"] == 250.0
+    assert record["request"]["params"]["name"] == "get_cart"
+    assert record["request"]["params"]["arguments"]["cart_id"].startswith(REDACTED_PREFIX)
+    assert "Lovelace" not in line
+    assert threads and threading.get_ident() not in threads
+
+
+def test_recorder_drops_records_when_the_queue_is_full(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(str(path), 1024 * 1024, 1, 1.0, "", queue_size=2)
+    recorder.listener.stop()
+
+    for i in range(4):
+        recorder.record({"id": i}, None, 200, started_at=float(i), duration=0.0)
+    assert recorder.queue_handler.dropped == 2
+
+    # Stopping with a full queue still writes what was queued.
+    recorder.listener.start()
+    recorder.stop()
+    assert len(path.read_text().splitlines()) == 2